@@ -1,8 +1,15 @@
+import copy
 import json
+import logging
+import math
 import os
+import queue
+import threading
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 import nidaqmx
+import numpy as np
 import scipy
 from nidaqmx.constants import (
     AccelSensitivityUnits,
@@ -11,10 +18,26 @@ from nidaqmx.constants import (
     ForceIEPESensorSensitivityUnits,
     ForceUnits,
 )
+from nidaqmx.stream_readers import AnalogMultiChannelReader
 from nidaqmx.system import System
 
 from sdlma_teds.teds import StandardTeds
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=128)
+def parse_ni_teds(teds_data: tuple) -> dict:
+    """
+    Helper function to parse a teds list of nidaqmx format.
+    The result is cached, since the same sensor always yields the same
+    bitstream on repeated scans.
+    :param teds_data: Teds list of nidaqmx format as tuple
+    :return: The cached teds dict, deep copy it before modifying
+    """
+    bitstream = StandardTeds.convert_nidaqmax_list_to_bitstream(teds_data)
+    return StandardTeds(bitstream).teds
+
 
 class SDLMAChannel:
 
@@ -50,10 +73,9 @@ class SDLMAChannel:
         :param teds_info: Dict for no teds
         """
         if teds_list:
-            bitstream = StandardTeds.convert_nidaqmax_list_to_bitstream(
-                teds_list
-            )
-            self.channel_info = StandardTeds(bitstream).teds
+            # The cached dict and its elements are shared by all channels
+            # with this sensor, so every channel gets its own deep copy
+            self.channel_info = copy.deepcopy(parse_ni_teds(tuple(teds_list)))
             self.is_resp = self.channel_info["acceleration_force"].val == 0
         elif teds_file_path:
             bitstream = StandardTeds.read_bitstream_from_file(teds_file_path)
@@ -67,7 +89,7 @@ class SDLMAChannel:
             self.channel_info["max_val"] = (
                 self.voltage_range[1] / self.channel_info["sens_ref"]
             )
-            print(self.channel_info["sens_ref"])
+            logger.debug("sens_ref=%s", self.channel_info["sens_ref"])
         else:
             raise ValueError("No hw_teds, vi_teds or sensor info given")
 
@@ -132,13 +154,21 @@ def nearest_even_divisor(n: int, target: int) -> int:
     :param target: the ideal target
     :return: The closest even divisor
     """
-    divisors = [i for i in range(1, n + 1) if n % i == 0]
-    closest = min(divisors, key=lambda x: abs(x - target))
-    return closest
+    # Divisors come in pairs (d, n // d), so checking up to sqrt(n) suffices
+    small = np.arange(1, math.isqrt(n) + 1, dtype=np.int64)
+    small = small[n % small == 0]
+    divisors = np.unique(np.concatenate([small, n // small]))
+    closest = divisors[np.argmin(np.abs(divisors - target))]
+    return int(closest)
 
 
 class SDLMANiTask(SDLMATask):
 
+    # Number of pending callbacks above which an overrun is reported
+    max_pending_callbacks = 8
+    # Seconds close() waits for a running callback to finish
+    consumer_join_timeout = 5.0
+
     def __init__(
         self,
         name: str,
@@ -157,12 +187,24 @@ class SDLMANiTask(SDLMATask):
 
         :param n_sample_callback: Callback function after n samples.
         :param done_callback: Callback function when done.
+        Both callbacks keep the nidaqmx signature, but are called from a
+        worker thread, so the DAQmx thread is never blocked by them.
         """
         super().__init__(name, meas_time, sampling_freq, channels)
         self.task = nidaqmx.Task(name)
         self.add_channels()
         buffer = int((sampling_freq * meas_time))
-        self.callback_interval = nearest_even_divisor(buffer, 2000)
+        # Limit the callback rate for high sampling frequencies
+        self.callback_interval = nearest_even_divisor(
+            buffer, max(2000, sampling_freq // 50)
+        )
+        # Reads go straight into numpy arrays instead of nested lists
+        self._reader = AnalogMultiChannelReader(self.task.in_stream)
+        # The DAQmx callbacks only hand over to a worker thread, which runs
+        # the user callbacks. The queue is unbounded, so handing over never
+        # blocks, a growing backlog is reported instead.
+        self._queue = queue.Queue()
+        self._consumer = None
         self.init_task(n_sample_callback, done_callback)
 
     def init_task(self, n_sample_callback, done_callback):
@@ -181,9 +223,75 @@ class SDLMANiTask(SDLMATask):
         )
         assert self.sampling_freq == self.task.timing.samp_clk_rate
         self.task.register_every_n_samples_acquired_into_buffer_event(
-            self.callback_interval, n_sample_callback
+            self.callback_interval,
+            self._hand_over(self._queue, n_sample_callback),
         )
-        self.task.register_done_event(done_callback)
+        self.task.register_done_event(
+            self._hand_over(self._queue, done_callback)
+        )
+
+    @classmethod
+    def _hand_over(cls, pending: queue.Queue, callback: callable) -> callable:
+        """
+        Wraps a user callback for DAQmx. The wrapper only queues the call for
+        the worker thread and returns at once. It holds no reference to the
+        task, so the task can still be garbage collected.
+        None is passed through, so DAQmx does not register a callback.
+        :param pending: The queue of the worker thread
+        :param callback: The user callback or None
+        :return: The callback to register with DAQmx
+        """
+        if callback is None:
+            return None
+        max_pending = cls.max_pending_callbacks
+
+        def hand_over(*args):
+            if pending.qsize() == max_pending:
+                logger.warning(
+                    "Callback overrun, %d calls pending", max_pending
+                )
+            pending.put_nowait((callback, args))
+            return 0
+
+        return hand_over
+
+    @staticmethod
+    def _consume(pending: queue.Queue):
+        """
+        Worker thread that runs the queued user callbacks.
+        :param pending: The queue of the worker thread
+        """
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            callback, args = item
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception("Error in callback %r", callback)
+
+    def _stop_consumer(self):
+        """Method to stop the worker thread if it is running"""
+        consumer = getattr(self, "_consumer", None)
+        if consumer is None:
+            return
+        self._consumer = None
+        # Calls still pending belong to the closed task and are dropped
+        dropped = 0
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            dropped += 1
+        if dropped:
+            logger.warning("Dropped %d pending callbacks on close", dropped)
+        self._queue.put_nowait(None)
+        if consumer is not threading.current_thread():
+            consumer.join(timeout=self.consumer_join_timeout)
+            if consumer.is_alive():
+                logger.warning("Callback worker did not stop in time")
 
     def add_channels(self):
         """
@@ -225,23 +333,69 @@ class SDLMANiTask(SDLMATask):
                     )
 
     def start(self):
+        if self._consumer is None:
+            self._consumer = threading.Thread(
+                target=self._consume, args=(self._queue,), daemon=True
+            )
+            self._consumer.start()
         self.task.start()
 
     def stop(self):
         self.task.stop()
 
     def read(self, number_of_samples):
-        return self.task.read(number_of_samples_per_channel=number_of_samples)
+        """
+        Method to read n samples per channel.
+
+        :param number_of_samples: The number of samples per channel
+        :return: New array of shape (channels, samples), 1d for a single
+        channel
+        """
+        data = np.empty((len(self.channels), number_of_samples))
+        self.read_into(data)
+        return data[0] if len(self.channels) == 1 else data
+
+    def read_into(self, data: np.ndarray) -> np.ndarray:
+        """
+        Method to read samples into an array owned by the caller, e.g. a
+        preallocated buffer that is reused between reads. Nothing is
+        allocated, the caller decides when the data may be overwritten.
+
+        :param data: C-contiguous float64 array of shape (channels, samples)
+        :return: The given array
+        """
+        self._reader.read_many_sample(
+            data, number_of_samples_per_channel=data.shape[1]
+        )
+        return data
 
     def close(self):
         """
         Method to delete the task for ni devices.
+        Closing an already closed task does nothing.
         """
-        self.task.close()
+        # task may be missing if the constructor failed
+        task = getattr(self, "task", None)
+        if task is None:
+            return
+        try:
+            task.close()
+        finally:
+            self.task = None
+            self._stop_consumer()
 
-    def __del__(self):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    def __del__(self):
+        try:
+            self.close()
+        except nidaqmx.errors.DaqError:
+            pass  # Nothing left to clean up during teardown
+
 
 class SDLMAHardware:
 
@@ -261,13 +415,32 @@ class SDLMAHardware:
         system = System().local()
         for device in system.devices:
             voltage_range = device.ai_voltage_rngs
+            # Querying teds on a channel without teds raises an error,
+            # so devices without hw teds support are not checked per channel
+            teds_supported = self.check_ni_teds_support(device)
             for channel in device.ai_physical_chans:
-                hw_teds, bitstream = self.check_ni_teds(channel)
+                hw_teds, bitstream = (
+                    self.check_ni_teds(channel)
+                    if teds_supported
+                    else (False, [])
+                )
                 channel = SDLMAChannel(channel.name, hw_teds, voltage_range)
                 if hw_teds:
                     channel.set_channel_info(teds_list=bitstream)
                 self.sdlma_channels.append(channel)
 
+    @staticmethod
+    def check_ni_teds_support(device: nidaqmx.system.device) -> bool:
+        """
+        Function to check if a device supports hw teds at all
+        :param device: The device that should be checked.
+        :return: bool indicating if the device supports hw teds
+        """
+        try:
+            return bool(device.hwteds_supported)
+        except nidaqmx.errors.DaqError:
+            return True  # Unknown - fall back to the per channel check
+
     @staticmethod
     def check_ni_teds(
         channel: nidaqmx.system.physical_channel,
@@ -285,3 +458,4 @@ class SDLMAHardware:
                 return False, []
             else:
                 raise exc  # Unknown Error - Reraise
+        return False, []
@@ -1,12 +1,11 @@
-from dataclasses import asdict
-
 import h5py
 import numpy as np
 from sdypy import EMA, FRF
 
 from sdlma_modal_analysis.sdlma_measurement import (
+    H5_DATASET_OPTIONS,
     SDLMAMeasurement,
-    SDLMATimeSeriesSEP005,
+    read_h5_datasets,
 )
 
 
@@ -52,6 +51,7 @@ class SDLMAEMA:
         self.coherence = None
         self.ema_object = None
         self.measurements = [] if measurements is None else measurements
+        self._unique_names_cache = None  # (fingerprint, names)
 
         self.nat_freq = nat_freq  # natural frequencies
         self.nat_xi = nat_xi  # damping coefficients
@@ -66,35 +66,50 @@ class SDLMAEMA:
         :param sdlma_measurement: SDLMAMeasurement object
         """
         self.measurements.append(sdlma_measurement)
+        self._unique_names_cache = None
 
     def get_unique_names(self) -> list[str]:
         """
         Method to get all unique signal names
         :return: List of unique signal names
         """
-        unique_names = []
+        # The measurement list is public, so the cache is additionally
+        # checked against a fingerprint of its current content
+        fingerprint = tuple(
+            (id(m), len(m._exc) + len(m._resp)) for m in self.measurements
+        )
+        if (
+            self._unique_names_cache is not None
+            and self._unique_names_cache[0] == fingerprint
+        ):
+            return list(self._unique_names_cache[1])
+        unique_names = {}  # dict as insertion ordered set
         for measurement in self.measurements:
             exc_names, resp_names = measurement.get_names()
             for name in exc_names + resp_names:
-                if name not in unique_names:
-                    unique_names.append(name)
-        return unique_names
+                unique_names.setdefault(name, None)
+        self._unique_names_cache = (fingerprint, list(unique_names))
+        return list(unique_names)
 
     def remove_measurement(self, sdlma_measurement: SDLMAMeasurement):
         """
         Method to remove a measurement from the lists of measurements
         :param sdlma_measurement: SDLMAMeasurement object
         """
-        pass
+        self.measurements.remove(sdlma_measurement)
+        self._unique_names_cache = None
 
     def calc(self):
         """
         Method that performs the curve fitting and modal parameter
         reconstruction via sdypy ema
         """
+        # One FRF row per response signal, filled block by block
+        total_rows = sum(len(m.resp) for m in self.measurements)
         frf_matrix = None
-        f_axis = None
         coherence = None
+        f_axis = None
+        offset = 0
         driving_point = 0
         for i, measurement in enumerate(self.measurements):
             for resp in measurement.resp:
@@ -105,13 +120,20 @@ class SDLMAEMA:
             frf_data = frf_data[:, 0, 1:]  # ONLY SIMO
             coherence_data = measurement.frf_object.get_coherence()[:, 1:]
 
-            if not isinstance(frf_matrix, np.ndarray):
-                frf_matrix = frf_data
-                coherence = coherence_data
+            if frf_matrix is None:
                 f_axis = measurement.frf_object.get_f_axis()[1:]
-            else:
-                frf_matrix = np.concatenate([frf_matrix, frf_data], axis=0)
-                coherence = np.concatenate([coherence, coherence_data], axis=0)
+                frf_matrix = np.empty(
+                    (total_rows, frf_data.shape[1]), dtype=frf_data.dtype
+                )
+                coherence = np.empty(
+                    (total_rows, coherence_data.shape[1]),
+                    dtype=coherence_data.dtype,
+                )
+            rows = frf_data.shape[0]
+            frf_matrix[offset : offset + rows] = frf_data
+            coherence[offset : offset + rows] = coherence_data
+            offset += rows
+        assert offset == total_rows
         # assert driving_point is not None
         self.frf_matrix = frf_matrix
         self.f_axis = f_axis
@@ -168,35 +190,35 @@ class SDLMAEMA:
             datagrp = h5_file["measurements"]
             for measurement in datagrp:
                 meas_grp = datagrp[measurement]
-                name = meas_grp.attrs["name"]
-                window_len = meas_grp.attrs["window_len"]
-                sampling_freq = meas_grp.attrs["sampling_freq"]
-                comment = meas_grp.attrs["comment"]
+                meas_attrs = dict(meas_grp.attrs)
+                name = meas_attrs["name"]
+                window_len = meas_attrs["window_len"]
+                sampling_freq = meas_attrs["sampling_freq"]
+                comment = meas_attrs["comment"]
                 exc = []
                 resp = []
                 for category, container in [("exc", exc), ("resp", resp)]:
                     sig_grp = meas_grp[category]
-                    for key in sig_grp:
-                        signal = sig_grp[key]
-                        data = signal["data"][()]
-                        unit_str = signal.attrs["unit_str"]
-                        fs = int(signal.attrs["fs"])
-                        quantity = signal.attrs["quantity"]
-                        sig_name = signal.attrs["name"]
-                        direction = (
-                            "+Z"
-                            if ("direction" not in signal.attrs)
-                            else signal.attrs["direction"]
-                        )
-                        time_series = SDLMATimeSeriesSEP005(
-                            data=data,
-                            unit_str=unit_str,
-                            fs=fs,
-                            quantity=quantity,
-                            name=sig_name,
-                            direction=direction,
+                    signals = [sig_grp[key] for key in sig_grp]
+                    datas = read_h5_datasets([s["data"] for s in signals])
+                    for signal, data in zip(signals, datas):
+                        # Read all attributes at once
+                        attrs = dict(signal.attrs)
+                        unit_str = attrs["unit_str"]
+                        fs = int(attrs["fs"])
+                        quantity = attrs["quantity"]
+                        sig_name = attrs["name"]
+                        direction = attrs.get("direction", "+Z")
+                        container.append(
+                            {
+                                "data": data,
+                                "unit_str": unit_str,
+                                "fs": fs,
+                                "quantity": quantity,
+                                "name": sig_name,
+                                "direction": direction,
+                            }
                         )
-                        container.append(asdict(time_series))
                 measurements.append(
                     SDLMAMeasurement(
                         name, window_len, sampling_freq, exc, resp, comment
@@ -227,11 +249,13 @@ class SDLMAEMA:
             h5_file.attrs["upper"] = self.upper
             h5_file.attrs["pol_order"] = self.pol_order
             h5_file.attrs["solver"] = self.solver
-            h5_file.create_dataset("nat_freq", data=self.nat_freq)
+            h5_file.create_dataset(
+                "nat_freq", data=self.nat_freq, **H5_DATASET_OPTIONS
+            )
             h5_file.create_dataset("nat_xi", data=self.nat_xi)
-            h5_file.create_dataset("A", data=self.A)
-            h5_file.create_dataset("H", data=self.H)
-            h5_file.create_dataset("phi", data=self.phi)
+            h5_file.create_dataset("A", data=self.A, **H5_DATASET_OPTIONS)
+            h5_file.create_dataset("H", data=self.H, **H5_DATASET_OPTIONS)
+            h5_file.create_dataset("phi", data=self.phi, **H5_DATASET_OPTIONS)
             h5_file.create_dataset("freq_estimates", data=self.freq_estimates)
             datagrp = h5_file.create_group("measurements")
             for i, measurement in enumerate(self.measurements):
@@ -247,7 +271,9 @@ class SDLMAEMA:
                     sig_grp = meas_grp.create_group(category)
                     for i, signal in enumerate(signals):
                         grp = sig_grp.create_group(f"signal_{i}")
-                        grp.create_dataset("data", data=signal["data"])
+                        grp.create_dataset(
+                            "data", data=signal["data"], **H5_DATASET_OPTIONS
+                        )
                         grp.attrs["unit_str"] = signal["unit_str"]
                         grp.attrs["fs"] = signal["fs"]
                         grp.attrs["quantity"] = signal["quantity"]
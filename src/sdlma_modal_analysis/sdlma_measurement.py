@@ -2,14 +2,42 @@
 SDLMA Measurement Module
 """
 
-import copy
 import os.path
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 
 import h5py
 import numpy as np
 from sdypy import FRF
 
+# Options for exported h5 datasets. lzf is fast and decompressed
+# transparently by h5py, shuffle improves the ratio for float data.
+H5_DATASET_OPTIONS = {"chunks": True, "compression": "lzf", "shuffle": True}
+
+
+def read_h5_datasets(datasets: list) -> list[np.ndarray]:
+    """
+    Helper function to read h5 datasets into preallocated arrays.
+    Datasets of equal shape and dtype share one buffer, which saves an
+    allocation per dataset.
+    :param datasets: List of h5py datasets
+    :return: List of arrays in the order of the datasets
+    """
+    if not datasets:
+        return []
+    shape = datasets[0].shape
+    dtype = datasets[0].dtype
+    if all(d.shape == shape and d.dtype == dtype for d in datasets):
+        buffers = list(np.empty((len(datasets), *shape), dtype=dtype))
+    else:
+        buffers = [np.empty(d.shape, dtype=d.dtype) for d in datasets]
+    for i, (dataset, buffer) in enumerate(zip(datasets, buffers)):
+        if dataset.size == 0:
+            # read_direct fails on empty datasets
+            buffers[i] = dataset[()]
+        else:
+            dataset.read_direct(buffer)
+    return buffers
+
 
 # https://pyfrf.readthedocs.io/en/latest/Showcase.html#SEP-005-input-data-compatibility-(MIMO-showcase)
 @dataclass
@@ -30,17 +58,19 @@ class SDLMATimeSeriesSEP005:
         names: list[str],
         directions: list[str],
     ) -> list[dict]:
+        # Plain dicts instead of asdict, which would deepcopy the data
         time_series_list = []
         for i in range(arr.shape[0]):
-            time_series = SDLMATimeSeriesSEP005(
-                arr[i, :],
-                unit_str,
-                fs,
-                quantity,
-                names[i],
-                directions[i],
+            time_series_list.append(
+                {
+                    "data": arr[i, :],
+                    "unit_str": unit_str,
+                    "fs": fs,
+                    "quantity": quantity,
+                    "name": names[i],
+                    "direction": directions[i],
+                }
             )
-            time_series_list.append(asdict(time_series))
         return time_series_list
 
 
@@ -72,7 +102,19 @@ class SDLMAMeasurement:
         self._exc = exc
         self._resp = resp
         self._comment = comment
-        self.frf_object = self.calc_frf(self.exc, self.resp, self.window_len)
+        # exc and resp are not changed after construction
+        self._exc_names = tuple(item["name"] for item in exc)
+        self._resp_names = tuple(item["name"] for item in resp)
+        # Kept for check_double_impact, which works on the same windows
+        self._exc_prepared = self.prepare_time_series(
+            self.exc, self.window_len
+        )
+        self._resp_prepared = self.prepare_time_series(
+            self.resp, self.window_len
+        )
+        self.frf_object = self._calc_frf_prepared(
+            self._exc_prepared, self._resp_prepared, self.window_len
+        )
 
     @property
     def name(self) -> str:
@@ -115,11 +157,29 @@ class SDLMAMeasurement:
         :param window_len: The window length
         :return: A pyfrf.FRF Object with applied H1 filter
         """
+        return SDLMAMeasurement._calc_frf_prepared(
+            SDLMAMeasurement.prepare_time_series(exc, window_len),
+            SDLMAMeasurement.prepare_time_series(resp, window_len),
+            window_len,
+        )
+
+    @staticmethod
+    def _calc_frf_prepared(
+        exc_list: list, resp_list: list, window_len: int
+    ) -> FRF.FRF:
+        """
+        Function to calculate the frf from already prepared time series
+
+        :param exc_list: The excitation output of prepare_time_series
+        :param resp_list: The response output of prepare_time_series
+        :param window_len: The window length
+        :return: A pyfrf.FRF Object with applied H1 filter
+        """
         with np.errstate(divide="ignore", invalid="ignore"):
             frf_object = FRF.FRF(
                 sampling_freq=None,
-                exc=SDLMAMeasurement.prepare_time_series(exc, window_len),
-                resp=SDLMAMeasurement.prepare_time_series(resp, window_len),
+                exc=exc_list,
+                resp=resp_list,
                 fft_len=window_len,
                 frf_type="H1",
             )
@@ -134,22 +194,29 @@ class SDLMAMeasurement:
         :return: A sep_005 compliant time series
         """
         out = None
+        rows = []
         for item in meas_list:
-            if not out:
-                # needed otherwise the original dict will be edited
-                out = copy.deepcopy(item)
-                out["data"] = out["data"].reshape(1, -1)
+            if out is None:
+                # Copy only the metadata, the original dict must not be edited
+                out = {key: val for key, val in item.items() if key != "data"}
             else:
                 out["name"] += "_" + item["name"]
-                out["data"] = np.vstack([out["data"], item["data"]])
+            rows.append(item["data"])
+        # Stack once instead of reallocating for every signal
+        out["data"] = np.vstack(rows)
 
         num_impacts = out["data"].shape[1] / window_len
         assert num_impacts % 1 == 0
-        chunks = np.split(out["data"], int(num_impacts), axis=1)
+        # View of shape (impacts, channels, window_len), no copies
+        chunks = (
+            out["data"]
+            .reshape(out["data"].shape[0], int(num_impacts), window_len)
+            .transpose(1, 0, 2)
+        )
         out_list = []
-        for i in range(len(chunks)):
+        for chunk in chunks:
             data = {
-                "data": chunks[i],
+                "data": chunk,
                 "unit_str": out["unit_str"],
                 "fs": out["fs"],
                 "quantity": out["quantity"],
@@ -164,9 +231,7 @@ class SDLMAMeasurement:
         Method to get the names of the excitation and response signals
         :return: A tuple containing the names
         """
-        exc_names = [item["name"] for item in self.exc]
-        resp_names = [item["name"] for item in self.resp]
-        return exc_names, resp_names
+        return list(self._exc_names), list(self._resp_names)
 
     @staticmethod
     def import_from_hd5f_file(filename: str):
@@ -184,23 +249,26 @@ class SDLMAMeasurement:
             resp = []
             for category, container in [("exc", exc), ("resp", resp)]:
                 grp = h5_file[category]
-                for key in grp:
-                    sig_grp = grp[key]
-                    data = sig_grp["data"][()]
-                    unit_str = sig_grp.attrs["unit_str"]
-                    fs = int(sig_grp.attrs["fs"])
-                    quantity = sig_grp.attrs["quantity"]
-                    sig_name = sig_grp.attrs["name"]
-                    sig_direction = sig_grp.attrs["direction"]
-                    time_series = SDLMATimeSeriesSEP005(
-                        data=data,
-                        unit_str=unit_str,
-                        fs=fs,
-                        quantity=quantity,
-                        name=sig_name,
-                        direction=sig_direction,
+                sig_grps = [grp[key] for key in grp]
+                datas = read_h5_datasets([g["data"] for g in sig_grps])
+                for sig_grp, data in zip(sig_grps, datas):
+                    # Read all attributes at once
+                    attrs = dict(sig_grp.attrs)
+                    unit_str = attrs["unit_str"]
+                    fs = int(attrs["fs"])
+                    quantity = attrs["quantity"]
+                    sig_name = attrs["name"]
+                    sig_direction = attrs["direction"]
+                    container.append(
+                        {
+                            "data": data,
+                            "unit_str": unit_str,
+                            "fs": fs,
+                            "quantity": quantity,
+                            "name": sig_name,
+                            "direction": sig_direction,
+                        }
                     )
-                    container.append(asdict(time_series))
         return SDLMAMeasurement(
             name=name,
             window_len=window_len,
@@ -229,17 +297,14 @@ class SDLMAMeasurement:
         num_impacts = self.exc[0]["data"].shape[0] / self.window_len
         assert num_impacts % 1 == 0  # Integer check
         num_impacts = int(num_impacts)
-        exc_list = SDLMAMeasurement.prepare_time_series(
-            self.exc, self.window_len
-        )
-        resp_list = SDLMAMeasurement.prepare_time_series(
-            self.resp, self.window_len
-        )
+        exc_list = self._exc_prepared
+        resp_list = self._resp_prepared
         ret = []
+        # is_data_ok does not depend on previous calls, one object suffices
+        frf = FRF.FRF(
+            sampling_freq=self.sampling_freq, fft_len=self.window_len
+        )
         for i in range(num_impacts):
-            frf = FRF.FRF(
-                sampling_freq=self.sampling_freq, fft_len=self.window_len
-            )
             if not frf.is_data_ok(
                 exc_list[i]["data"],
                 resp_list[i]["data"],
@@ -268,7 +333,9 @@ class SDLMAMeasurement:
                 grp = h5_file.create_group(category)
                 for i, measurement in enumerate(measurements):
                     sig_grp = grp.create_group(f"signal_{i}")
-                    sig_grp.create_dataset("data", data=measurement["data"])
+                    sig_grp.create_dataset(
+                        "data", data=measurement["data"], **H5_DATASET_OPTIONS
+                    )
                     sig_grp.attrs["unit_str"] = measurement["unit_str"]
                     sig_grp.attrs["fs"] = measurement["fs"]
                     sig_grp.attrs["quantity"] = measurement["quantity"]
@@ -4,28 +4,45 @@ from datetime import datetime
 import numpy as np
 import pyuff
 
+# Mapping of directions to uff direction integers
+_DIRECTION_TO_INT = {
+    "Scalar": 0,
+    "+X": 1,
+    "-X": -1,
+    "+Y": 2,
+    "-Y": -2,
+    "+Z": 3,
+    "-Z": -3,
+}
+
+# Static 2420 set with the global main coordinate system, written by hand
+# because pyuff.prepare_2420 does not produce the correct format yet
+_COORD_SYSTEM_2420 = (
+    "    -1\n"
+    "  2420\n"
+    "         1\n"
+    "Name\n"
+    "         1         0         8\n"
+    "Coord 1\n"
+    "   1.0000000000000000e+00   0.0000000000000000e+00"
+    "   0.0000000000000000e+00\n"
+    "   0.0000000000000000e+00   1.0000000000000000e+00"
+    "   0.0000000000000000e+00\n"
+    "   0.0000000000000000e+00   0.0000000000000000e+00"
+    "   1.0000000000000000e+00\n"
+    "    -1\n"
+)
+
 
 def direction_to_int(direction_str: str) -> int:
     """
     Helper function to map the direction to uff direction integers
     :param direction_str: The direction to convert
     """
-    if direction_str == "Scalar":
-        return 0
-    elif direction_str == "+X":
-        return 1
-    elif direction_str == "-X":
-        return -1
-    elif direction_str == "+Y":
-        return 2
-    elif direction_str == "-Y":
-        return -2
-    elif direction_str == "+Z":
-        return 3
-    elif direction_str == "-Z":
-        return -3
-    else:
-        ValueError("Not implemented")
+    try:
+        return _DIRECTION_TO_INT[direction_str]
+    except KeyError:
+        raise ValueError(f"Unknown direction {direction_str!r}") from None
 
 
 class SDLMAUFF:
@@ -35,7 +52,10 @@ class SDLMAUFF:
         self.pyuff = pyuff.UFF(filename)
         self.name = name
         self.nodes_to_names = {}
-        if 151 not in self.pyuff.get_set_types():
+        # Set types present in the file. pyuff scans the whole file for
+        # these, so they are read once and then kept up to date here.
+        self._set_types = set(self.pyuff.get_set_types())
+        if 151 not in self._set_types:
             self.write_header()
 
     def write_header(self):
@@ -63,6 +83,7 @@ class SDLMAUFF:
             time_db_written=time_db_created,
         )
         self.pyuff._write_set(dataset, "add")
+        self._set_types.add(151)
 
     def write_coord_system(self):
         """
@@ -78,24 +99,10 @@ class SDLMAUFF:
         # dataset["nodes"] = dataset["CS_matrices"]
         # self.pyuff._write_set(dataset, 'add')
 
-        if 2420 not in self.pyuff.get_set_types():
+        if 2420 not in self._set_types:
             with open(self.filename, "at") as f:
-                f.write("    -1\n")
-                f.write("  2420\n")
-                f.write("         1\n")
-                f.write("Name\n")
-                f.write("         1         0         8\n")
-                f.write("Coord 1\n")
-                f.write(
-                    "   1.0000000000000000e+00   0.0000000000000000e+00   0.0000000000000000e+00\n"
-                )
-                f.write(
-                    "   0.0000000000000000e+00   1.0000000000000000e+00   0.0000000000000000e+00\n"
-                )
-                f.write(
-                    "   0.0000000000000000e+00   0.0000000000000000e+00   1.0000000000000000e+00\n"
-                )
-                f.write("    -1\n")
+                f.write(_COORD_SYSTEM_2420)
+            self._set_types.add(2420)
 
     def write_units(self):
         """
@@ -110,8 +117,9 @@ class SDLMAUFF:
             temp=1.0,
             temp_offset=1.0,
         )
-        if 164 not in self.pyuff.get_set_types():
+        if 164 not in self._set_types:
             self.pyuff._write_set(dataset, "add")
+            self._set_types.add(164)
 
     def write_nodes(self, nodes: list):
         """
@@ -119,32 +127,32 @@ class SDLMAUFF:
         All nodes are currently referenced to global main coordinate system.
         :param nodes: List of nodes
         """
-        node_nums = []
-        def_cs = []
-        disp_cs = []
-        color = []
-        x = []
-        y = []
-        z = []
-        for i in range(0, len(nodes)):
-            node_nums.append(i + 1)
-            def_cs.append(0)
-            disp_cs.append(0)
-            color.append(0)
-            x.append(nodes[i][0])
-            y.append(nodes[i][1])
-            z.append(nodes[i][2])
+        if len(nodes) == 0:
+            coords = np.empty((0, 3))
+        else:
+            coords = np.asarray(nodes, dtype=np.float64)
+            if coords.ndim != 2 or coords.shape[1] < 3:
+                raise ValueError(
+                    f"Nodes need x, y and z coordinates, got shape "
+                    f"{coords.shape}"
+                )
+            # Like the per node access before, extra columns are ignored
+            coords = coords[:, :3]
+        num_nodes = coords.shape[0]
+        # pyuff only accepts the default int dtype for the integer columns
+        zeros = np.zeros(num_nodes, dtype=int)
         dataset = pyuff.prepare_15(
-            node_nums=node_nums,
-            def_cs=def_cs,
-            disp_cs=disp_cs,
-            color=color,
-            x=x,
-            y=y,
-            z=z,
+            node_nums=np.arange(1, num_nodes + 1, dtype=int),
+            def_cs=zeros,
+            disp_cs=zeros,
+            color=zeros,
+            x=coords[:, 0],
+            y=coords[:, 1],
+            z=coords[:, 2],
         )
-        if 15 not in self.pyuff.get_set_types():
+        if 15 not in self._set_types:
             self.pyuff._write_set(dataset, "add")
+            self._set_types.add(15)
 
     def write_mesh(self, lines: list[list], faces: list[list]):
         """
@@ -152,29 +160,28 @@ class SDLMAUFF:
         :param lines: List of line elements
         :param faces: List of triangles and quad elements
         """
-        if 2412 not in self.pyuff.get_set_types():
+        if 2412 not in self._set_types:
+            # Assemble the whole set first and write it at once
+            parts = ["    -1\n", "  2412\n"]
+            cnt = 0
+            for face in faces:
+                cnt = cnt + 1
+                elem = 94 if len(face) == 4 else 91
+                parts.append(
+                    f"{cnt:10d}{elem:10d}{0:10d}{0:10d}{0:10d}{len(face):10d}\n"
+                )
+                parts.append("".join(f"{node + 1:10d}" for node in face))
+                parts.append("\n")
+            for line in lines:
+                cnt = cnt + 1
+                parts.append(f"{cnt:10d}{11:10d}{0:10d}{0:10d}{1:10d}{2:10d}\n")
+                parts.append(f"{0:10d}{1:10d}{1:10d}\n")
+                parts.append("".join(f"{node + 1:10d}" for node in line))
+                parts.append("\n")
+            parts.append("    -1\n")
             with open(self.filename, "at") as f:
-                f.write("    -1\n")
-                f.write("  2412\n")
-                cnt = 0
-                for i in range(len(faces)):
-                    cnt = cnt + 1
-                    elem = 94 if len(faces[i]) == 4 else 91
-                    f.write(
-                        f"{cnt:10d}{elem:10d}{0:10d}{0:10d}{0:10d}{len(faces[i]):10d}\n"
-                    )
-                    for node in faces[i]:
-                        f.write(f"{node + 1:10d}")
-                    f.write("\n")
-                for i in range(len(lines)):
-                    cnt = cnt + 1
-                    f.write(f"{cnt:10d}{11:10d}{0:10d}{0:10d}{1:10d}{2:10d}\n")
-                    f.write(f"{0:10d}{1:10d}{1:10d}\n")
-                    for node in lines[i]:
-                        f.write(f"{node + 1:10d}")
-                    f.write("\n")
-                f.write("    -1\n")
-
+                f.write("".join(parts))
+            self._set_types.add(2412)
 
     def write_frfs(self, sdlma_ema: object, mp_to_node: dict):
         """
@@ -185,7 +192,7 @@ class SDLMAUFF:
         :param mp_to_node: The translation from mp in the sdlma_ema object
         to the node number
         """
-        if 58 not in self.pyuff.get_set_types():
+        if 58 not in self._set_types:
             for measurement in sdlma_ema.measurements:
                 reference_node = mp_to_node[measurement.exc[0]["name"]]
                 reference_direction = direction_to_int(
@@ -195,11 +202,20 @@ class SDLMAUFF:
                     "H1", form="accelerance"
                 )
                 frequency = measurement.frf_object.get_f_axis()[1:]
-                for i, signal in enumerate(measurement.resp):
-                    response_node = mp_to_node[signal["name"]]
-                    response_direction = direction_to_int(signal["direction"])
-                    displacement_complex = frf_object[i, 0, 1:]
-                    name = "TestCase"
+                # Resolve all channels up front, the loop only emits sets
+                frf_slab = np.ascontiguousarray(frf_object[:, 0, 1:])
+                response_nodes = [
+                    mp_to_node[signal["name"]] for signal in measurement.resp
+                ]
+                response_directions = [
+                    direction_to_int(signal["direction"])
+                    for signal in measurement.resp
+                ]
+                name = "TestCase"
+                for i, (response_node, response_direction) in enumerate(
+                    zip(response_nodes, response_directions)
+                ):
+                    displacement_complex = frf_slab[i]
                     dataset = pyuff.prepare_58(
                         binary=0,
                         func_type=4,
@@ -218,6 +234,7 @@ class SDLMAUFF:
                         orddenom_spec_data_type=13,
                     )
                     self.pyuff._write_set(dataset, "add")
+                    self._set_types.add(58)
 
     def write_modes(self, sdlma_ema, mp_to_node):
         """
@@ -227,7 +244,7 @@ class SDLMAUFF:
         :param mp_to_node: The translation from mp in the sdlma_ema object
         to the node number
         """
-        if 55 not in self.pyuff.get_set_types():
+        if 55 not in self._set_types:
             resp_list = []
             j = 0
 
@@ -239,27 +256,24 @@ class SDLMAUFF:
 
             # Sort by node and channel index
             resp_list.sort(key=lambda x: (x[1], x[0]))
+            # Channel index, axis (0, 1, 2 or -1 for scalar) and sign
+            chan_idx = np.array([j for j, _, _ in resp_list], dtype=np.intp)
+            directions = np.array(
+                [direction_to_int(d) for _, _, d in resp_list], dtype=np.int8
+            )
+            axis = np.abs(directions) - 1
+            sign = np.sign(directions)
+            # Mode independent data is shared by all datasets. pyuff only
+            # accepts the default int dtype for node numbers
+            node_nums = np.array([node for _, node, _ in resp_list], dtype=int)
+            zeros = np.zeros(len(resp_list))
+            phi = np.asarray(sdlma_ema.phi)
             for i, freq in enumerate(sdlma_ema.nat_freq):
                 name = f"Mode {i + 1} at {freq} Hz"
-                r1, r2, r3, r4, r5, r6, node_nums = [], [], [], [], [], [], []
-                for j, node, direction in resp_list:
-                    val = sdlma_ema.phi[j][i]
-                    x = y = z = 0.0 + 0.0j
-
-                    if "X" in direction:
-                        x = val if direction == "+X" else -val
-                    elif "Y" in direction:
-                        y = val if direction == "+Y" else -val
-                    elif "Z" in direction:
-                        z = val if direction == "+Z" else -val
-
-                    r1.append(x)
-                    r2.append(y)
-                    r3.append(z)
-                    r4.append(0.0)
-                    r5.append(0.0)
-                    r6.append(0.0)
-                    node_nums.append(node)
+                vals = sign * phi[chan_idx, i]
+                r1 = np.where(axis == 0, vals, 0)
+                r2 = np.where(axis == 1, vals, 0)
+                r3 = np.where(axis == 2, vals, 0)
 
                 dataset = pyuff.prepare_55(
                     model_type=1,
@@ -273,9 +287,9 @@ class SDLMAUFF:
                     spec_data_type=12,
                     data_type=5,
                     n_data_per_node=3,
-                    r1=r4,
-                    r2=r5,
-                    r3=r6,
+                    r1=zeros,
+                    r2=zeros,
+                    r3=zeros,
                     r4=None,
                     r5=None,
                     r6=None,
@@ -292,6 +306,7 @@ class SDLMAUFF:
                 dataset["r3"] = r3
                 dataset["eig"] = 0.0 + freq * 2j * math.pi
                 self.pyuff._write_set(dataset, "add")
+                self._set_types.add(55)
 
     def get_points(self):
         data = self.pyuff.read_sets()
@@ -18,20 +18,24 @@ class StandardTeds:
 
     ni_preamble = hex(0xDA6E0CCCBA)
 
-    @staticmethod
-    def read_bitstream_from_file(file_path):
+    # Virtual teds files store one bit per byte as 0x00 or 0x01
+    _file_bytes_to_bin = bytes.maketrans(b"\x00\x01", b"01")
+    _bin_to_file_bytes = bytes.maketrans(b"01", b"\x00\x01")
+
+    @classmethod
+    def read_bitstream_from_file(cls, file_path):
         """
         Method to read virtual teds files from the specified path.
-        Because the simple read includes a lot of hex overhead only every
-        fourth character is actually needed.
+        The files store every bit as a separate byte, which are translated
+        to a binary string directly.
 
         :param file_path: The path to the virtual teds file.
         :return:
         """
         with open(file_path, "rb") as file:
             teds_data = file.read()
-            teds_data = str(teds_data)[2:]
-            return BitStream("0b" + teds_data[3::4])
+        bits = teds_data.translate(cls._file_bytes_to_bin).decode("ascii")
+        return BitStream(bin=bits)
 
     @staticmethod
     def convert_nidaqmax_list_to_bitstream(teds_data: list) -> BitStream:
@@ -41,10 +45,14 @@ class StandardTeds:
         :param teds_data: The teds list of integers
         :return: A standard teds bitstream
         """
-        bitstream = BitStream()
-        for item in teds_data:
-            bits = BasicTedsElement.reverse_bitstream(BitStream(bin(item)))
-            bitstream += BasicTedsElement.zero_pad_bitstream(bits)
+        pieces = [
+            BasicTedsElement.zero_pad_bitstream(
+                BasicTedsElement.reverse_bitstream(BitStream(bin(item)))
+            )
+            for item in teds_data
+        ]
+        # Join once, appending would copy the growing stream every time
+        bitstream = BitStream().join(pieces)
         bitstream.pos = 0
         return bitstream
 
@@ -55,10 +63,9 @@ class StandardTeds:
         for key in teds:
             if not isinstance(teds[key], ConstantTedsElement):
                 bitstream.append(teds[key].to_bits())
+        # One byte per bit, see read_bitstream_from_file
+        out = bitstream.bin.encode("ascii").translate(cls._bin_to_file_bytes)
         with open(filename, "wb") as file:
-            out = b""
-            for i in range(0, len(bitstream), 1):
-                out += bytes([bitstream[i]])
             file.write(out)
 
     def __init__(self, bitstream: BitStream, has_preamble: bool = False):
@@ -101,13 +108,14 @@ class StandardTeds:
         self.write_teds_to_file(self.teds, filename)
 
     def process(self, teds_dict):
-        for key in list(teds_dict):
-            bits = (
-                self.bitstream.read(self.bitstream.len - self.bitstream.pos)
-                if (teds_dict[key].len == -1)
-                else (self.bitstream.read(teds_dict[key].len))
-            )
-            teds_dict[key].from_bits(bits)
+        # Resolve elements and their lengths once, not per dict lookup
+        entries = [(element, element.len) for element in teds_dict.values()]
+        total_len = self.bitstream.len
+        for element, length in entries:
+            # -1 marks an element that takes the rest of the bitstream
+            if length == -1:
+                length = total_len - self.bitstream.pos
+            element.from_bits(self.bitstream.read(length))
         self.teds.update(teds_dict)
 
     def load_template(self, template_id):
@@ -1,19 +1,32 @@
 import enum
 import math
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any
 
 from bitstring import Bits
 
 
-@dataclass
 class BasicTedsElement(ABC):
-    len: int
+    # Plain slotted classes, the elements are created for every teds field
+    __slots__ = ("len", "val")
+    # Attributes shown in repr and compared in eq
+    _fields = ("len", "val")
 
-    def __init__(self):
-        self.val = None
+    def __init__(self, len: int, val: Any = None):
+        self.len = len
+        self.val = val
+
+    def __repr__(self):
+        args = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{type(self).__name__}({args})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self._fields)
+
+    __hash__ = None
 
     @abstractmethod
     def from_bits(self, bitstream):
@@ -36,79 +49,83 @@ class BasicTedsElement(ABC):
     def reverse_bitstream(bitstream):
         return bitstream[::-1]
 
+    @staticmethod
+    def from_bitstream(bitstream):
+        # Teds stores integers lsb first, reading the reversed bits as
+        # unsigned int replaces padding to full bytes and int.from_bytes
+        return bitstream[::-1].uint if len(bitstream) else 0
+
     def to_bitstream(self, int_val):
         return self.reverse_bitstream(Bits(uint=int_val, length=self.len))
 
 
-@dataclass
 class UnIntTedsElement(BasicTedsElement):
-    val: Any = None
+    __slots__ = ()
 
     def from_bits(self, bitstream):
-        bitstream = self.reverse_bitstream(self.zero_pad_bitstream(bitstream))
-        self.val = int.from_bytes(bitstream, signed=False)
+        self.val = self.from_bitstream(bitstream)
 
     def to_bits(self):
         super().to_bits()
         return self.to_bitstream(self.val)
 
 
-@dataclass
 class Chr5TedsElement(BasicTedsElement):
-    val: Any = ""
+    __slots__ = ()
+
+    def __init__(self, len: int, val: Any = ""):
+        super().__init__(len, val)
+
+    # Lookup tables between the 5 bit codes and the characters. The bits
+    # are stored in reversed order, the code is offset by ord("`")
+    # https://stackoverflow.com/questions/23199733/convert-numbers-into-corresponding-letter-using-python
+    _encode_table = tuple(format(i, "05b")[::-1] for i in range(32))
+    _decode_table = tuple(chr(ord("`") + i) for i in range(32))
 
     def from_bits(self, bitstream):
-        self.val = ""
-        for i in range(0, len(bitstream), 5):
-            cur_val = bitstream.read(5)
-            cur_char = self.reverse_bitstream(self.zero_pad_bitstream(cur_val))
-            # https://stackoverflow.com/questions/23199733/convert-numbers-into-corresponding-letter-using-python
-            self.val += chr(ord("`") + int.from_bytes(cur_char, signed=False))
+        self.val = "".join(
+            self._decode_table[bitstream.read(5)[::-1].uint]
+            for i in range(0, len(bitstream), 5)
+        )
 
     def to_bits(self):
         super().to_bits()
-        val = ""
-        for char in self.val:
-            char_val = (bin(ord(char)))[2:]
-            val = val + char_val.zfill(5)[-5:][::-1]
+        val = "".join(
+            self._encode_table[ord(char) & 0x1F] for char in self.val
+        )
         return Bits(bin=val)
 
 
-@dataclass
 class AsciiTedsElement(BasicTedsElement):
-    val: Any = ""
+    __slots__ = ()
+
+    def __init__(self, len: int, val: Any = ""):
+        super().__init__(len, val)
 
     def from_bits(self, bitstream):
-        self.val = ""
+        chars = []
         for i in range(
             0, len(bitstream), 7
         ):  # TODO: Smarter to check if 0b0000000?
             if bitstream.len - bitstream.pos >= 7:
                 cur_val = bitstream.read(7)
-                cur_char = self.reverse_bitstream(
-                    self.zero_pad_bitstream(cur_val)
-                )
                 # https://stackoverflow.com/questions/23199733/convert-numbers-into-corresponding-letter-using-python
-                self.val += chr(int.from_bytes(cur_char, signed=False))
+                chars.append(chr(self.from_bitstream(cur_val)))
+        self.val = "".join(chars)
 
     def to_bits(self):
         super().to_bits()
-        val = ""
-        for char in self.val:
-            # https://stackoverflow.com/questions/23199733/convert-numbers-into-corresponding-letter-using-python
-            char_val = (bin(ord(char)))[2:]
-            val = val + char_val.zfill(7)[::-1]
+        # https://stackoverflow.com/questions/23199733/convert-numbers-into-corresponding-letter-using-python
+        val = "".join(bin(ord(char))[2:].zfill(7)[::-1] for char in self.val)
         return Bits(bin=val)
 
 
-@dataclass
 class DateTedsElement(BasicTedsElement):
-    val: Any = None
+    __slots__ = ()
 
     def from_bits(self, bitstream):
-        bitstream = self.reverse_bitstream(self.zero_pad_bitstream(bitstream))
         self.val = datetime(1998, 1, 1) + timedelta(
-            days=int.from_bytes(bitstream, signed=False)
+            days=self.from_bitstream(bitstream)
         )
 
     def to_bits(self):
@@ -117,8 +134,8 @@ class DateTedsElement(BasicTedsElement):
         return self.to_bitstream(date_val.days)
 
 
-@dataclass
 class SingleTedsElement(BasicTedsElement):
+    __slots__ = ()
 
     def from_bits(self, bitstream):
         raise NotImplementedError()
@@ -127,15 +144,17 @@ class SingleTedsElement(BasicTedsElement):
         raise NotImplementedError()
 
 
-@dataclass
 class ConResTedsElement(BasicTedsElement):
-    start: float
-    step: float
-    val: Any = None
+    __slots__ = ("start", "step")
+    _fields = ("len", "start", "step", "val")
+
+    def __init__(self, len: int, start: float, step: float, val: Any = None):
+        super().__init__(len, val)
+        self.start = start
+        self.step = step
 
     def from_bits(self, bitstream):
-        bitstream = self.reverse_bitstream(self.zero_pad_bitstream(bitstream))
-        self.val = self.start + int.from_bytes(bitstream) * self.step
+        self.val = self.start + self.from_bitstream(bitstream) * self.step
 
     def to_bits(self):
         super().to_bits()
@@ -143,29 +162,37 @@ class ConResTedsElement(BasicTedsElement):
         return self.to_bitstream(int_val)
 
 
-@dataclass
 class ConRelResTedsElement(BasicTedsElement):
-    start: float
-    step: float
-    val: Any = None
+    __slots__ = ("start", "step", "_base", "_log_base")
+    _fields = ("len", "start", "step", "val")
+
+    def __init__(self, len: int, start: float, step: float, val: Any = None):
+        super().__init__(len, val)
+        self.start = start
+        self.step = step
+        # start and step are constant, so the base is computed once. The
+        # log must be taken of the float base used in from_bits, log1p
+        # would not round trip exactly.
+        self._base = 1 + 2 * self.step
+        self._log_base = math.log(self._base)
 
     def from_bits(self, bitstream):
         # Found from tdl pdf
-        bitstream = self.reverse_bitstream(self.zero_pad_bitstream(bitstream))
-        self.val = self.start * (1 + 2 * self.step) ** int.from_bytes(
-            bitstream
-        )
+        self.val = self.start * self._base ** self.from_bitstream(bitstream)
 
     def to_bits(self):
         super().to_bits()
-        int_val = math.log(self.val / self.start) / math.log(1 + 2 * self.step)
+        int_val = math.log(self.val / self.start) / self._log_base
         return self.to_bitstream(int_val)
 
 
-@dataclass
 class EnumTedsElement(BasicTedsElement):
-    options: enum.IntEnum
-    val: Any = None
+    __slots__ = ("options",)
+    _fields = ("len", "options", "val")
+
+    def __init__(self, len: int, options: enum.IntEnum, val: Any = None):
+        super().__init__(len, val)
+        self.options = options
 
     def from_bits(self, bitstream):
         raise NotImplementedError()
@@ -174,9 +201,8 @@ class EnumTedsElement(BasicTedsElement):
         raise NotImplementedError()
 
 
-@dataclass
 class ConstantTedsElement(BasicTedsElement):
-    val: Any = None
+    __slots__ = ()
 
     def from_bits(self, bitstream):
         pass